@@ -0,0 +1,91 @@
+"""
+Helpers shared by analyze.py and generate_summary.py.
+
+Kept free of heavy imports (no anthropic SDK) so both scripts can load it
+cheaply.
+"""
+import os
+
+import msgspec
+
+RESULTS_FILE = "test-results.json"
+
+
+# Typed view of the pytest-json-report fields we use. msgspec skips every
+# other field while decoding, and attribute access replaces nested .get()
+# chains with their throwaway {} defaults.
+class Crash(msgspec.Struct):
+    message: str = ""
+
+
+class Call(msgspec.Struct):
+    crash: Crash = msgspec.field(default_factory=Crash)
+    longrepr: str = ""
+
+
+class TestRecord(msgspec.Struct):
+    nodeid: str = "Unknown"
+    outcome: str = ""
+    call: Call = msgspec.field(default_factory=Call)
+
+
+class Report(msgspec.Struct):
+    summary: dict = {}
+    tests: list[TestRecord] = []
+
+
+class ReportSummary(msgspec.Struct):
+    summary: dict = {}
+
+
+_decode_report = msgspec.json.Decoder(Report).decode
+_decode_summary = msgspec.json.Decoder(ReportSummary).decode
+
+
+def read_test_results(summary_only=False):
+    """Read pytest results from JSON file.
+
+    Returns {"summary": ..., "failed_tests": [TestRecord, ...]} or None.
+    With summary_only, the tests array is skipped without being decoded
+    and failed_tests is empty.
+    """
+    if not os.path.exists(RESULTS_FILE):
+        return None
+    with open(RESULTS_FILE, 'rb') as f:
+        data = f.read()
+    if summary_only:
+        return {"summary": _decode_summary(data).summary, "failed_tests": []}
+    report = _decode_report(data)
+    failed_tests = [test for test in report.tests if test.outcome == "failed"]
+    return {"summary": report.summary, "failed_tests": failed_tests}
+
+
+def extract_failures(test_results):
+    """Flatten failed tests into records shared by the prompt and reports.
+
+    Each record has nodeid, name, file, longrepr and crash_msg, so callers
+    don't repeat the nodeid split.
+    """
+    if not test_results:
+        return []
+    failures = []
+    append = failures.append
+    for test in test_results.get("failed_tests", ()):
+        nodeid = test.nodeid
+        # find/rfind slice the file and test name without building a list
+        sep = nodeid.find("::")
+        if sep >= 0:
+            name = nodeid[nodeid.rfind("::") + 2:]
+            file_path = nodeid[:sep]
+        else:
+            name = nodeid
+            file_path = ""
+        call = test.call
+        append({
+            "nodeid": nodeid,
+            "name": name,
+            "file": file_path,
+            "longrepr": call.longrepr,
+            "crash_msg": call.crash.message
+        })
+    return failures
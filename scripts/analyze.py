@@ -8,151 +8,299 @@ In production, replace the API call with Ollama or vLLM endpoint.
 import os
 import sys
 import json
-import subprocess
+import asyncio
+import hashlib
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime
 
+import jinja2
+
 try:
-    import anthropic
+    import orjson
 except ImportError:
-    print("Installing anthropic package...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "anthropic", "-q"])
-    import anthropic
-
-
-def get_git_diff():
-    """Get the git diff for the current commit."""
-    try:
-        result = subprocess.run(
-            ["git", "diff", "HEAD~1", "--stat"],
-            capture_output=True,
-            text=True
-        )
-        diff_stat = result.stdout if result.returncode == 0 else "No diff available"
-        
-        result = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%s%n%b"],
-            capture_output=True,
-            text=True
-        )
-        commit_msg = result.stdout if result.returncode == 0 else "No commit message"
-        
-        return diff_stat, commit_msg
-    except Exception as e:
-        return f"Error getting diff: {e}", ""
-
-
-def get_changed_files():
-    """Get list of changed files."""
-    try:
-        result = subprocess.run(
-            ["git", "diff", "HEAD~1", "--name-only"],
-            capture_output=True,
-            text=True
-        )
-        return result.stdout.strip().split('\n') if result.returncode == 0 else []
-    except:
-        return []
-
-
-def get_git_info():
-    """Get branch and author info."""
+    orjson = None
+
+from _analyze_common import extract_failures, read_test_results
+
+# HTML report template, compiled once at import. Autoescaping covers commit
+# messages, test output and LLM text, none of which are trusted HTML.
+TEMPLATE = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(os.path.dirname(os.path.abspath(__file__))),
+    autoescape=True,
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True
+).get_template("report.html.j2")
+
+# Report colors
+STATUS_COLOR_OK = "#22c55e"
+STATUS_COLOR_FAIL = "#ef4444"
+STATUS_COLOR_UNKNOWN = "#f59e0b"
+RISK_COLORS = {
+    "LOW": "#22c55e",
+    "MEDIUM": "#f59e0b",
+    "HIGH": "#ef4444"
+}
+REPORT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S UTC'
+
+MODEL = "claude-3-5-haiku-20241022"
+MAX_TOKENS = 512
+TEMPERATURE = 0.0
+
+# API client settings; the SDK default read timeout is 10 minutes
+LLM_TIMEOUT = 30.0
+LLM_CONNECT_TIMEOUT = 5.0
+LLM_MAX_RETRIES = 3
+
+# Runs with no failures and fewer changed files than this skip the LLM
+SMALL_CHANGE_THRESHOLD = 20
+
+# Prompt size budget; past this, only the largest failures are sent
+PROMPT_MAX_CHARS = 16000
+PROMPT_MAX_FAILURES = 20
+
+# Raw pytest output sent to the LLM when no structured failures exist
+OUTPUT_TAIL_BYTES = 500
+
+# git invocation: no pager, no color, no user/system config lookups. This
+# also keeps user settings (e.g. log.showSignature) out of parsed output.
+GIT = [
+    "git", "--no-pager",
+    "-c", "color.ui=false",
+    "-c", "core.preloadindex=false",
+    "-c", "gc.auto=0"
+]
+GIT_ENV = {
+    "PATH": os.environ.get("PATH", os.defpath),
+    "HOME": tempfile.gettempdir(),
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_SYSTEM": os.devnull
+}
+
+GitInfo = namedtuple("GitInfo", "diff_stat commit_msg changed_files branch author")
+
+# Shared async client, created on first use so the aiohttp session binds to
+# the running event loop.
+_client = None
+
+
+async def _git(*args):
+    """Run a git command, returning decoded stdout or None on failure."""
     try:
-        branch_result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True
-        )
-        branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "unknown"
-        
-        author_result = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%an"],
-            capture_output=True,
-            text=True
+        proc = await asyncio.create_subprocess_exec(
+            *GIT, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=GIT_ENV
         )
-        author = author_result.stdout.strip() if author_result.returncode == 0 else "unknown"
-        
-        return branch, author
-    except:
-        return "unknown", "unknown"
-
-
-def read_test_results():
-    """Read pytest results from JSON file."""
-    results_file = "test-results.json"
-    if os.path.exists(results_file):
-        with open(results_file, 'r') as f:
-            return json.load(f)
-    return None
+        stdout, _ = await proc.communicate()
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    return stdout.decode("utf-8", "replace")
+
+
+async def _last_commit():
+    """Return (commit_msg, branch, author) from a single git log call."""
+    out = await _git("log", "-1", "--pretty=format:%an%x00%D%x00%s%n%b")
+    if out is None:
+        return "No commit message", "unknown", "unknown"
+    author, refs, commit_msg = out.split("\0", 2)
+    return commit_msg, parse_branch(refs), author.strip() or "unknown"
+
+
+def parse_branch(refs):
+    """Return the branch name from a `git log --pretty=%D` ref list.
+
+    %D lists "HEAD -> <branch>" when on a branch; a detached HEAD reports
+    plain "HEAD", matching `git rev-parse --abbrev-ref HEAD`.
+    """
+    for ref in refs.split(", "):
+        if ref.startswith("HEAD -> "):
+            return ref[len("HEAD -> "):]
+    return "HEAD"
+
+
+def _plural(count, singular, plural):
+    return f"{count} {singular if count == 1 else plural}"
+
+
+def parse_numstat(out):
+    """Turn `git diff --numstat` output into (diff_stat, changed_files).
+
+    diff_stat lists "+added -deleted" per file (or "Bin" for binary files)
+    followed by a summary line worded like git's --stat.
+    """
+    lines = []
+    changed_files = []
+    insertions = deletions = 0
+    for line in out.splitlines():
+        added, deleted, path = line.split("\t", 2)
+        changed_files.append(path)
+        if added == "-":
+            lines.append(f" {path} | Bin")
+            continue
+        insertions += int(added)
+        deletions += int(deleted)
+        lines.append(f" {path} | +{added} -{deleted}")
+    if changed_files:
+        # Like git: omit a zero count unless both are zero
+        summary = [_plural(len(changed_files), "file changed", "files changed")]
+        if insertions or not deletions:
+            summary.append(_plural(insertions, "insertion(+)", "insertions(+)"))
+        if deletions or not insertions:
+            summary.append(_plural(deletions, "deletion(-)", "deletions(-)"))
+        lines.append(" " + ", ".join(summary))
+    return "\n".join(lines), changed_files
+
+
+async def _diff_numstat():
+    """Return (diff_stat, changed_files) from a single git diff call."""
+    out = await _git("diff", "HEAD~1", "--numstat", "--no-renames")
+    if out is None:
+        return "No diff available", []
+    return parse_numstat(out)
+
+
+async def get_git_data():
+    """Collect commit and diff info with two concurrent git processes."""
+    (commit_msg, branch, author), (diff_stat, changed_files) = await asyncio.gather(
+        _last_commit(),
+        _diff_numstat()
+    )
+    return GitInfo(diff_stat, commit_msg, changed_files, branch, author)
 
 
 def read_test_output():
-    """Read raw test output."""
+    """Read the tail of the raw test output.
+
+    Only the last OUTPUT_TAIL_BYTES are ever sent to the LLM, so seek there
+    instead of loading the whole log.
+    """
     output_file = "test-output.txt"
     if os.path.exists(output_file):
-        with open(output_file, 'r') as f:
-            return f.read()
+        size = os.stat(output_file).st_size
+        with open(output_file, 'rb') as f:
+            f.seek(max(0, size - OUTPUT_TAIL_BYTES))
+            return f.read().decode("utf-8", "replace")
     return "No test output available"
 
 
-def analyze_with_llm(test_results, test_output, diff_stat, commit_msg, changed_files):
-    """Send data to LLM for analysis."""
-    
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        print("ERROR: ANTHROPIC_API_KEY not set")
-        sys.exit(1)
-    
-    client = anthropic.Anthropic(api_key=api_key)
-    
-    # Build context
-    if test_results:
-        summary = test_results.get("summary", {})
-        tests_passed = summary.get("passed", 0)
-        tests_failed = summary.get("failed", 0)
-        total_tests = summary.get("total", 0)
-        duration = summary.get("duration", 0)
-        
-        failed_tests = []
-        for test in test_results.get("tests", []):
-            if test.get("outcome") == "failed":
-                failed_tests.append({
-                    "name": test.get("nodeid", "unknown"),
-                    "message": test.get("call", {}).get("longrepr", "No details")
-                })
-    else:
-        tests_passed = 0
-        tests_failed = 0
-        total_tests = 0
-        duration = 0
-        failed_tests = []
-    
-    prompt = f"""You are a DevOps assistant analyzing CI/CD pipeline results. 
-Provide a concise, actionable analysis for the engineering team.
+@contextmanager
+def atomic_write(path):
+    """Open a temp file for binary writing and move it over path on success.
+
+    Readers (artifact uploaders, concurrent jobs) never see a partial file.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb', buffering=64 * 1024) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def json_dumps(obj):
+    """Serialize to a compact JSON string, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _cache_path(prompt):
+    """Return the cache file for this request, or None if caching is off.
+
+    Enabled by setting LLM_CACHE_DIR. The key covers model, max_tokens,
+    temperature and the full prompt text.
+    """
+    cache_dir = os.environ.get("LLM_CACHE_DIR")
+    if not cache_dir:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{MODEL}\0{MAX_TOKENS}\0{TEMPERATURE}\0".encode())
+    h.update(prompt.encode())
+    return os.path.join(cache_dir, f"{h.hexdigest()}.json")
+
+
+def read_cached_response(prompt):
+    """Return a cached LLM response for this prompt, if any."""
+    path = _cache_path(prompt)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return json_loads(f.read())["text"]
+    except (OSError, ValueError, KeyError):
+        return None
+
 
-## Git Changes
-Commit message: {commit_msg}
+def write_cached_response(prompt, text):
+    """Store an LLM response, writing atomically so readers never see partial files.
+
+    Best effort: the cache is only an optimisation, so write errors are
+    reported and otherwise ignored.
+    """
+    path = _cache_path(prompt)
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_write(path) as f:
+            f.write(json_dumps({"model": MODEL, "max_tokens": MAX_TOKENS, "text": text}).encode())
+    except OSError as e:
+        print(f"  - Could not write LLM cache: {e}")
+
+
+def get_client(api_key):
+    """Return the shared AsyncAnthropic client (aiohttp transport).
+
+    The SDK is imported here rather than at module level; it pulls in
+    httpx/pydantic and is not needed on cache hits or by helper importers.
+    """
+    global _client
+    if _client is None:
+        import anthropic
+        _client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            http_client=anthropic.DefaultAioHttpClient(),
+            timeout=anthropic.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            max_retries=LLM_MAX_RETRIES
+        )
+    return _client
 
-Files changed:
-{diff_stat}
 
-Changed files list: {', '.join(changed_files) if changed_files else 'None detected'}
+async def close_client():
+    """Close the shared client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
 
-## Test Results
-- Total tests: {total_tests}
-- Passed: {tests_passed}
-- Failed: {tests_failed}
-- Duration: {duration:.2f}s
 
-## Failed Tests Details
-{json.dumps(failed_tests, indent=2) if failed_tests else 'No failures'}
+PROMPT_HEADER = """You are a DevOps assistant analyzing CI/CD pipeline results. 
+Provide a concise, actionable analysis for the engineering team.
 
-## Raw Test Output (last 2000 chars)
-{test_output[-2000:] if test_output else 'No output'}
+"""
 
+PROMPT_INSTRUCTIONS = """
 ---
 
 Please provide your analysis in the following JSON format (respond ONLY with valid JSON, no markdown):
-{{
+{
     "summary": "2-3 sentence summary of what changed and overall test status",
     "risk_level": "LOW|MEDIUM|HIGH",
     "risk_reasons": ["reason 1", "reason 2"],
@@ -160,17 +308,78 @@ Please provide your analysis in the following JSON format (respond ONLY with val
     "regression_check": "Whether failures are in new tests or existing regression tests",
     "recommendations": ["recommendation 1", "recommendation 2"],
     "quick_fixes": ["file: fix description", "file: fix description"]
-}}
+}
 
 Keep it concise and actionable. No fluff."""
 
-    response = client.messages.create(
-        model="claude-3-5-haiku-20241022",
-        max_tokens=1024,
+
+def _join_prompt(summary, records, omitted, test_output, diff_stat, commit_msg, changed_files):
+    """Assemble the prompt from parts with a single join."""
+    payload = {"summary": summary, "failures": records}
+    if omitted:
+        payload["omitted_failures"] = omitted
+    
+    parts = [PROMPT_HEADER]
+    parts.append("## Git Changes\n")
+    parts.append(f"Commit message: {commit_msg}\n\n")
+    parts.append(f"Files changed:\n{diff_stat}\n\n")
+    parts.append(f"Changed files list: {', '.join(changed_files) if changed_files else 'None detected'}\n\n")
+    parts.append("## Test Results (JSON)\n")
+    parts.append(json_dumps(payload))
+    parts.append("\n")
+    # The raw pytest output is only included when there are no structured
+    # failures to go on (e.g. collection errors).
+    if not records:
+        parts.append(f"\n## Raw Test Output (tail)\n{test_output if test_output else 'No output'}\n")
+    parts.append(PROMPT_INSTRUCTIONS)
+    return "".join(parts)
+
+
+def build_prompt(test_results, failures, test_output, diff_stat, commit_msg, changed_files):
+    """Build the LLM prompt from a compact, structured view of the run.
+
+    If the prompt exceeds PROMPT_MAX_CHARS, only the PROMPT_MAX_FAILURES
+    failures with the longest messages are kept.
+    """
+    summary = test_results.get("summary", {}) if test_results else {}
+    records = [
+        {"id": f["nodeid"], "msg": f["longrepr"][:400] or "No details"}
+        for f in failures
+    ]
+    args = (test_output, diff_stat, commit_msg, changed_files)
+    prompt = _join_prompt(summary, records, 0, *args)
+    if len(prompt) > PROMPT_MAX_CHARS and len(records) > PROMPT_MAX_FAILURES:
+        kept = sorted(records, key=lambda r: len(r["msg"]), reverse=True)[:PROMPT_MAX_FAILURES]
+        prompt = _join_prompt(summary, kept, len(records) - len(kept), *args)
+    return prompt
+
+
+async def analyze_with_llm(test_results, failures, test_output, diff_stat, commit_msg, changed_files):
+    """Send data to LLM for analysis."""
+    
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        print("ERROR: ANTHROPIC_API_KEY not set")
+        sys.exit(1)
+    
+    prompt = build_prompt(test_results, failures, test_output, diff_stat, commit_msg, changed_files)
+
+    cached = read_cached_response(prompt)
+    if cached is not None:
+        print("  - Using cached LLM response")
+        return cached
+    
+    client = get_client(api_key)
+    response = await client.messages.create(
+        model=MODEL,
+        max_tokens=MAX_TOKENS,
+        temperature=TEMPERATURE,
         messages=[{"role": "user", "content": prompt}]
     )
     
-    return response.content[0].text
+    text = response.content[0].text
+    write_cached_response(prompt, text)
+    return text
 
 
 def parse_llm_response(response_text):
@@ -182,7 +391,7 @@ def parse_llm_response(response_text):
             text = text.split("```")[1]
             if text.startswith("json"):
                 text = text[4:]
-        return json.loads(text)
+        return json_loads(text)
     except:
         # Return default structure if parsing fails
         return {
@@ -196,7 +405,36 @@ def parse_llm_response(response_text):
         }
 
 
-def generate_html_report(analysis_data, test_results, commit_msg, branch, author):
+def is_clean_run(test_results, changed_files):
+    """True when every test passed and the change set is small."""
+    if not test_results:
+        return False
+    summary = test_results.get("summary", {})
+    return (
+        summary.get("total", 0) > 0
+        and summary.get("failed", 0) == 0
+        and summary.get("error", 0) == 0
+        and len(changed_files) < SMALL_CHANGE_THRESHOLD
+    )
+
+
+def clean_run_analysis(test_results, changed_files):
+    """Canned analysis for a clean run, in the same shape as the LLM's."""
+    summary = test_results.get("summary", {})
+    passed = summary.get("passed", 0)
+    total = summary.get("total", 0)
+    return {
+        "summary": f"{passed}/{total} tests passed across {len(changed_files)} changed file(s). No failures detected.",
+        "risk_level": "LOW",
+        "risk_reasons": ["All tests passed", f"Small change set ({len(changed_files)} files)"],
+        "failed_tests_analysis": "No failures detected",
+        "regression_check": "No regressions detected",
+        "recommendations": ["No action required"],
+        "quick_fixes": []
+    }
+
+
+def generate_html_report(analysis_data, test_results, failures, commit_msg, branch, author):
     """Generate HTML report for Jenkins/GitHub Actions."""
     
     if test_results:
@@ -204,325 +442,67 @@ def generate_html_report(analysis_data, test_results, commit_msg, branch, author
         passed = summary.get("passed", 0)
         failed = summary.get("failed", 0)
         total = summary.get("total", 0)
-        status_color = "#22c55e" if failed == 0 else "#ef4444"
+        status_color = STATUS_COLOR_OK if failed == 0 else STATUS_COLOR_FAIL
         status_text = "PASSED" if failed == 0 else "FAILED"
     else:
         passed = failed = total = 0
-        status_color = "#f59e0b"
+        status_color = STATUS_COLOR_UNKNOWN
         status_text = "UNKNOWN"
     
-    # Risk level colors
     risk_level = analysis_data.get("risk_level", "MEDIUM")
-    risk_colors = {
-        "LOW": "#22c55e",
-        "MEDIUM": "#f59e0b", 
-        "HIGH": "#ef4444"
-    }
-    risk_color = risk_colors.get(risk_level, "#f59e0b")
+    risk_color = RISK_COLORS.get(risk_level, RISK_COLORS["MEDIUM"])
     
-    # Build failed tests HTML
-    failed_tests_html = ""
-    if test_results and failed > 0:
-        failed_tests_html = "<ul class='failed-list'>"
-        for test in test_results.get("tests", []):
-            if test.get("outcome") == "failed":
-                nodeid = test.get("nodeid", "Unknown")
-                parts = nodeid.split("::")
-                test_name = parts[-1] if len(parts) > 1 else nodeid
-                file_path = parts[0] if len(parts) > 1 else ""
-                error_msg = test.get("call", {}).get("crash", {}).get("message", "")[:150]
-                
-                failed_tests_html += f"""
-                <li>
-                    <strong>{test_name}</strong>
-                    <div class="test-detail">📁 {file_path}</div>
-                    <div class="test-detail">💬 {error_msg}</div>
-                </li>
-                """
-        failed_tests_html += "</ul>"
-    else:
-        failed_tests_html = "<p class='success-text'>✓ All tests passed successfully</p>"
+    # Failed tests for the template
+    failed_tests = []
+    if failed > 0:
+        failed_tests = [
+            {"name": f["name"], "file": f["file"], "msg": f["crash_msg"][:150]}
+            for f in failures
+        ]
     
-    # Build risk reasons HTML
-    risk_reasons_html = "<ul class='bullet-list'>"
-    for reason in analysis_data.get("risk_reasons", []):
-        risk_reasons_html += f"<li>{reason}</li>"
-    risk_reasons_html += "</ul>"
-    
-    # Build recommendations HTML
-    recommendations_html = "<ul class='bullet-list'>"
-    for rec in analysis_data.get("recommendations", []):
-        recommendations_html += f"<li>{rec}</li>"
-    recommendations_html += "</ul>"
-    
-    # Build quick fixes HTML
-    quick_fixes = analysis_data.get("quick_fixes", [])
-    quick_fixes_html = ""
-    if quick_fixes:
-        quick_fixes_html = "<ul class='bullet-list'>"
-        for fix in quick_fixes:
-            quick_fixes_html += f"<li><code>{fix}</code></li>"
-        quick_fixes_html += "</ul>"
-    else:
-        quick_fixes_html = "<p class='muted'>No quick fixes suggested</p>"
-    
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Pipeline Analysis Report</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #0f172a;
-            color: #e2e8f0;
-            padding: 40px;
-            line-height: 1.6;
-        }}
-        .container {{
-            max-width: 900px;
-            margin: 0 auto;
-        }}
-        .header {{
-            margin-bottom: 32px;
-        }}
-        .header h1 {{
-            color: #f8fafc;
-            font-size: 1.75rem;
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }}
-        .header-meta {{
-            color: #94a3b8;
-            font-size: 0.9rem;
-            margin-top: 8px;
-        }}
-        .status-badge {{
-            display: inline-block;
-            background: {status_color};
-            color: white;
-            padding: 6px 16px;
-            border-radius: 4px;
-            font-weight: 600;
-            font-size: 0.85rem;
-            margin: 16px 0;
-        }}
-        .commit-box {{
-            background: #334155;
-            padding: 12px 16px;
-            border-radius: 6px;
-            font-family: monospace;
-            font-size: 0.9rem;
-            margin-bottom: 24px;
-            border-left: 4px solid {status_color};
-        }}
-        .metrics {{
-            display: flex;
-            gap: 16px;
-            margin-bottom: 32px;
-        }}
-        .metric {{
-            background: #1e293b;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-            flex: 1;
-        }}
-        .metric-value {{
-            font-size: 2rem;
-            font-weight: 700;
-        }}
-        .metric-value.green {{ color: #22c55e; }}
-        .metric-value.red {{ color: #ef4444; }}
-        .metric-value.blue {{ color: #38bdf8; }}
-        .metric-label {{
-            color: #94a3b8;
-            font-size: 0.85rem;
-            margin-top: 4px;
-        }}
-        .section {{
-            background: #1e293b;
-            padding: 24px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-        }}
-        .section h2 {{
-            color: #f8fafc;
-            font-size: 1.1rem;
-            margin-bottom: 16px;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        .section p {{
-            color: #cbd5e1;
-            font-size: 0.95rem;
-        }}
-        .risk-badge {{
-            display: inline-block;
-            background: {risk_color};
-            color: white;
-            padding: 4px 12px;
-            border-radius: 4px;
-            font-weight: 600;
-            font-size: 0.8rem;
-            margin-left: 8px;
-        }}
-        .bullet-list {{
-            list-style: none;
-            padding: 0;
-            margin: 12px 0 0 0;
-        }}
-        .bullet-list li {{
-            position: relative;
-            padding-left: 20px;
-            margin-bottom: 10px;
-            color: #cbd5e1;
-            font-size: 0.95rem;
-        }}
-        .bullet-list li::before {{
-            content: "•";
-            position: absolute;
-            left: 0;
-            color: #38bdf8;
-            font-weight: bold;
-        }}
-        .failed-list {{
-            list-style: none;
-            padding: 0;
-            margin: 12px 0 0 0;
-        }}
-        .failed-list li {{
-            background: #334155;
-            padding: 12px 16px;
-            border-radius: 6px;
-            margin-bottom: 12px;
-            border-left: 4px solid #ef4444;
-        }}
-        .failed-list li strong {{
-            color: #f8fafc;
-            font-size: 0.95rem;
-        }}
-        .test-detail {{
-            color: #94a3b8;
-            font-size: 0.85rem;
-            margin-top: 6px;
-            padding-left: 8px;
-        }}
-        .success-text {{
-            color: #22c55e;
-            font-size: 0.95rem;
-        }}
-        .muted {{
-            color: #64748b;
-            font-size: 0.9rem;
-            font-style: italic;
-        }}
-        code {{
-            background: #334155;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-family: monospace;
-            font-size: 0.85rem;
-        }}
-        .footer {{
-            margin-top: 32px;
-            padding-top: 16px;
-            border-top: 1px solid #334155;
-            color: #64748b;
-            font-size: 0.8rem;
-            text-align: center;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📊 Pipeline Analysis Report</h1>
-            <div class="header-meta">Branch: <strong>{branch}</strong> • Author: <strong>{author}</strong></div>
-        </div>
-        
-        <span class="status-badge">{status_text}</span>
-        
-        <div class="commit-box">📝 {commit_msg[:100] if commit_msg else 'No commit message'}</div>
-        
-        <div class="metrics">
-            <div class="metric">
-                <div class="metric-value blue">{total}</div>
-                <div class="metric-label">Total Tests</div>
-            </div>
-            <div class="metric">
-                <div class="metric-value green">{passed}</div>
-                <div class="metric-label">Passed</div>
-            </div>
-            <div class="metric">
-                <div class="metric-value {'red' if failed > 0 else 'green'}">{failed}</div>
-                <div class="metric-label">Failed</div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>📋 Summary</h2>
-            <p>{analysis_data.get('summary', 'No summary available')}</p>
-        </div>
-        
-        <div class="section">
-            <h2>⚠️ Risk Assessment <span class="risk-badge">{risk_level}</span></h2>
-            {risk_reasons_html}
-        </div>
-        
-        <div class="section">
-            <h2>❌ Failed Tests</h2>
-            {failed_tests_html}
-        </div>
-        
-        <div class="section">
-            <h2>🔄 Regression Analysis</h2>
-            <p>{analysis_data.get('regression_check', 'No regression analysis available')}</p>
-        </div>
-        
-        <div class="section">
-            <h2>💡 Recommendations</h2>
-            {recommendations_html}
-        </div>
-        
-        <div class="section">
-            <h2>🔧 Quick Fixes</h2>
-            {quick_fixes_html}
-        </div>
-        
-        <div class="footer">
-            Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')} • 
-            Model: Claude Haiku (simulating local Qwen/LLaMA 7B)
-        </div>
-    </div>
-</body>
-</html>
-"""
+    stream = TEMPLATE.stream(
+        status_color=status_color,
+        status_text=status_text,
+        risk_level=risk_level,
+        risk_color=risk_color,
+        branch=branch,
+        author=author,
+        commit_msg=commit_msg,
+        total=total,
+        passed=passed,
+        failed=failed,
+        summary=analysis_data.get("summary", "No summary available"),
+        risk_reasons=analysis_data.get("risk_reasons", []),
+        failed_tests=failed_tests,
+        regression_check=analysis_data.get("regression_check", "No regression analysis available"),
+        recommendations=analysis_data.get("recommendations", []),
+        quick_fixes=analysis_data.get("quick_fixes", []),
+        generated_at=datetime.now().strftime(REPORT_TIME_FORMAT)
+    )
     
-    with open("analysis-report.html", "w") as f:
-        f.write(html)
+    with atomic_write("analysis-report.html") as f:
+        stream.dump(f, encoding="utf-8")
     
     print(f"\n📄 HTML Report saved to: analysis-report.html")
 
 
-def main():
+async def main():
     print("=" * 60)
     print("🔍 CI/CD LLM Analysis")
     print("=" * 60)
     
-    # Gather data
+    # Gather data (git subprocesses and file reads run concurrently)
     print("\n📊 Gathering pipeline data...")
-    diff_stat, commit_msg = get_git_diff()
-    changed_files = get_changed_files()
-    test_results = read_test_results()
-    test_output = read_test_output()
-    branch, author = get_git_info()
+    (
+        (diff_stat, commit_msg, changed_files, branch, author),
+        test_results,
+        test_output,
+    ) = await asyncio.gather(
+        get_git_data(),
+        asyncio.to_thread(read_test_results),
+        asyncio.to_thread(read_test_output)
+    )
+    failures = extract_failures(test_results)
     
     print(f"  - Branch: {branch}")
     print(f"  - Author: {author}")
@@ -530,18 +510,27 @@ def main():
     print(f"  - Changed files: {len(changed_files)}")
     print(f"  - Test results: {'Found' if test_results else 'Not found'}")
     
-    # Analyze with LLM
-    print("\n🤖 Analyzing with LLM...")
-    raw_analysis = analyze_with_llm(
-        test_results, 
-        test_output, 
-        diff_stat, 
-        commit_msg, 
-        changed_files
-    )
-    
-    # Parse response
-    analysis_data = parse_llm_response(raw_analysis)
+    if is_clean_run(test_results, changed_files) and os.environ.get("FORCE_LLM") != "1":
+        # Green run on a small change: the LLM has nothing to add
+        print("\n✅ All tests passed on a small change, skipping LLM (set FORCE_LLM=1 to override)")
+        analysis_data = clean_run_analysis(test_results, changed_files)
+    else:
+        # Analyze with LLM
+        print("\n🤖 Analyzing with LLM...")
+        try:
+            raw_analysis = await analyze_with_llm(
+                test_results, 
+                failures, 
+                test_output, 
+                diff_stat, 
+                commit_msg, 
+                changed_files
+            )
+        finally:
+            await close_client()
+        
+        # Parse response
+        analysis_data = parse_llm_response(raw_analysis)
     
     # Output
     print("\n" + "=" * 60)
@@ -553,7 +542,7 @@ def main():
     print("=" * 60)
     
     # Generate HTML report
-    generate_html_report(analysis_data, test_results, commit_msg, branch, author)
+    generate_html_report(analysis_data, test_results, failures, commit_msg, branch, author)
     
     # Exit with appropriate code
     if test_results:
@@ -566,4 +555,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
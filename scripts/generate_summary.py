@@ -1,17 +1,47 @@
 #!/usr/bin/env python3
-import json
 import os
-import xml.etree.ElementTree as ET
+import sys
+
+# Report templates, built once at import
+_HEADER = (
+    "## %s • Pipeline Analysis Report\n\n"
+    "| Metric | Count |\n"
+    "|--------|-------|\n"
+    "| 📊 Total Tests | %d |\n"
+    "| ✅ Passed | %d |\n"
+    "| ❌ Failed | %d |\n"
+    "| 📈 Coverage | %.1f%% |\n"
+    "\n"
+)
+_COVERAGE_FAILED = (
+    "### ⚠️ Coverage Below Threshold\n\n"
+    "• Current: **%.1f%%**\n"
+    "• Required: **70%%**\n"
+    "\n"
+)
+_FAILED_HEADER = "### ❌ Failed Tests\n\n"
+_FAILED_TEST = "• **%s**\n  • 📁 `%s`\n"
+_FAILED_MSG = "  • 💬 `%s`\n"
+_FOOTER = (
+    "---\n"
+    "📎 Download full HTML report from **Artifacts** section above\n"
+)
 
 def main():
     if not os.path.exists('test-results.json'):
         print("No test results found")
         return
     
-    with open('test-results.json', 'r') as f:
-        data = json.load(f)
+    # Imported here so runs without test results (e.g. cancelled jobs)
+    # skip loading the JSON decoder
+    from _analyze_common import extract_failures, read_test_results
+    
+    # Decode only the summary; the per-test records are needed only when
+    # something failed
+    test_results = read_test_results(summary_only=True)
+    
+    summary = test_results['summary']
     
-    summary = data.get('summary', {})
     passed = summary.get('passed', 0)
     failed = summary.get('failed', 0)
     total = summary.get('total', 0)
@@ -20,8 +50,13 @@ def main():
     coverage = 0
     coverage_failed = False
     if os.path.exists('coverage.xml'):
-        tree = ET.parse('coverage.xml')
-        coverage = float(tree.getroot().get('line-rate', 0)) * 100
+        import xml.etree.ElementTree as ET
+        
+        # line-rate is on the root element: stop after its start tag
+        # instead of building the per-file/per-line tree
+        with open('coverage.xml', 'rb') as f:
+            _, root = next(ET.iterparse(f, events=('start',)))
+        coverage = float(root.get('line-rate', 0)) * 100
         if coverage < 70:
             coverage_failed = True
     
@@ -31,42 +66,25 @@ def main():
     else:
         status = "✅ PASSED"
     
-    print(f"## {status} • Pipeline Analysis Report\n")
-    print("| Metric | Count |")
-    print("|--------|-------|")
-    print(f"| 📊 Total Tests | {total} |")
-    print(f"| ✅ Passed | {passed} |")
-    print(f"| ❌ Failed | {failed} |")
-    print(f"| 📈 Coverage | {coverage:.1f}% |")
-    print()
+    # Build the whole report, then write it to stdout in one call
+    parts = [_HEADER % (status, total, passed, failed, coverage)]
     
     if coverage_failed:
-        print(f"### ⚠️ Coverage Below Threshold\n")
-        print(f"• Current: **{coverage:.1f}%**")
-        print(f"• Required: **70%**")
-        print()
+        parts.append(_COVERAGE_FAILED % coverage)
     
     if failed > 0:
-        print("### ❌ Failed Tests\n")
-        for test in data.get('tests', []):
-            if test.get('outcome') == 'failed':
-                nodeid = test.get('nodeid', 'Unknown')
-                parts = nodeid.split('::')
-                test_name = parts[-1] if len(parts) > 1 else nodeid
-                file_path = parts[0] if len(parts) > 1 else ''
-                
-                print(f"• **{test_name}**")
-                print(f"  • 📁 `{file_path}`")
-                
-                crash = test.get('call', {}).get('crash', {})
-                if crash:
-                    msg = crash.get('message', '')[:150]
-                    if msg:
-                        print(f"  • 💬 `{msg}`")
-                print()
+        parts.append(_FAILED_HEADER)
+        append = parts.append
+        for failure in extract_failures(read_test_results()):
+            append(_FAILED_TEST % (failure['name'], failure['file']))
+            
+            msg = failure['crash_msg'][:150]
+            if msg:
+                append(_FAILED_MSG % msg)
+            append("\n")
     
-    print("---")
-    print("📎 Download full HTML report from **Artifacts** section above")
+    parts.append(_FOOTER)
+    sys.stdout.write(''.join(parts))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main() or 0)
\ No newline at end of file
@@ -1,35 +1,28 @@
 """
 Input validation module for user data.
 """
+import re
+
+# local@domain.tld in one C-level scan; bound method skips the attribute lookup
+_EMAIL_MATCH = re.compile(r"[^@]+@[^@]+\.[^@]+").fullmatch
+
 
 def validate_email(email):
     """Check if email format is valid."""
     if not email:
         return False
-    if "@" not in email:
-        return False
-    if "." not in email.split("@")[1]:
-        return False
-    return True
+    return _EMAIL_MATCH(email) is not None
 
 
 def validate_age(age):
     """Check if age is valid."""
-    if not isinstance(age, int):
-        return False
-    if age < 0 or age > 150:
-        return False
-    return True
+    # Exact type check: also rejects bool, which subclasses int
+    return type(age) is int and 0 <= age <= 150
 
 
 def validate_username(username):
     """Check if username meets requirements."""
     if not username:
         return False
-    if len(username) < 3:
-        return False
-    if len(username) > 20:
-        return False
-    if not username.isalnum():
-        return False
-    return True
\ No newline at end of file
+    # O(1) length bound first, so isalnum() scans at most 20 characters
+    return 3 <= len(username) <= 20 and username.isalnum()
\ No newline at end of file
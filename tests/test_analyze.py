@@ -0,0 +1,52 @@
+"""
+Tests for the git output parsers in the analysis script.
+"""
+import pytest
+import sys
+sys.path.insert(0, 'scripts')
+
+from analyze import parse_branch, parse_numstat
+
+
+class TestParseBranch:
+    def test_attached_head(self):
+        assert parse_branch("HEAD -> main, origin/main") == "main"
+    
+    def test_attached_head_slashed_branch(self):
+        assert parse_branch("HEAD -> feature/x, tag: v1.0") == "feature/x"
+    
+    def test_detached_head(self):
+        assert parse_branch("HEAD, origin/main") == "HEAD"
+    
+    def test_empty_refs(self):
+        assert parse_branch("") == "HEAD"
+
+
+class TestParseNumstat:
+    def test_single_file(self):
+        diff_stat, changed_files = parse_numstat("1\t0\tsrc/calculator.py\n")
+        assert changed_files == ["src/calculator.py"]
+        assert diff_stat == (
+            " src/calculator.py | +1 -0\n"
+            " 1 file changed, 1 insertion(+)"
+        )
+    
+    def test_multiple_files(self):
+        diff_stat, changed_files = parse_numstat("3\t1\ta.py\n0\t2\tb.py\n")
+        assert changed_files == ["a.py", "b.py"]
+        assert diff_stat.splitlines()[-1] == " 2 files changed, 3 insertions(+), 3 deletions(-)"
+    
+    def test_binary_file(self):
+        diff_stat, changed_files = parse_numstat("-\t-\timg/logo.png\n")
+        assert changed_files == ["img/logo.png"]
+        assert diff_stat == (
+            " img/logo.png | Bin\n"
+            " 1 file changed, 0 insertions(+), 0 deletions(-)"
+        )
+    
+    def test_path_with_tab(self):
+        _, changed_files = parse_numstat("1\t1\tdir/odd\tname.txt\n")
+        assert changed_files == ["dir/odd\tname.txt"]
+    
+    def test_empty_output(self):
+        assert parse_numstat("") == ("", [])
@@ -20,6 +20,12 @@ class TestValidateEmail:
     
     def test_empty_email(self):
         assert validate_email("") == False
+    
+    def test_invalid_email_no_local_part(self):
+        assert validate_email("@example.com") == False
+    
+    def test_invalid_email_multiple_at(self):
+        assert validate_email("user@host@example.com") == False
 
 
 class TestValidateAge:
@@ -37,12 +43,19 @@ class TestValidateAge:
     
     def test_string_age(self):
         assert validate_age("25") == False
+    
+    def test_bool_age(self):
+        assert validate_age(True) == False
 
 
 class TestValidateUsername:
     def test_valid_username(self):
         assert validate_username("john123") == True
     
+    def test_length_bounds(self):
+        assert validate_username("abc") == True
+        assert validate_username("a" * 20) == True
+    
     def test_too_short(self):
         assert validate_username("ab") == False
     